@@ -1,52 +1,68 @@
+from operator import itemgetter
 from pathlib import Path
 from typing import Dict, Any
 import yaml
 
+try:
+    from yaml import CSafeLoader as _YamlLoader  # libyaml加速版本
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 from libs.exceptions import ConfigValidationError
 
+# 校验所需的字段集合：模块级常量，避免每次校验重建
+_REQUIRED_SECTIONS = frozenset({"event_hubs"})
+_REQUIRED_HUB_FIELDS = frozenset({"name", "connection_str", "consumer_group", "partitions"})
+_hub_getter = itemgetter("name", "partitions")
 
 
 class ConfigLoader:
+    # 进程级缓存：键为(解析后路径, 修改时间)，避免重复解析同一配置
+    _CACHE: Dict[tuple, Dict[str, Any]] = {}
+
     def __init__(self, config_path: Path = None):
         self.config_path = config_path or Path(__file__).parent.parent.parent / "config" / "config.yml"
         self._config = None
-        
+
     def load(self) -> Dict[str, Any]:
-        """加载并验证配置文件"""
+        """加载并验证配置文件（同进程内按路径+mtime缓存）"""
         try:
-            with open(self.config_path, 'r') as f:
-                config = yaml.safe_load(f)
-                self._validate_structure(config)
-                self._validate_values(config)
+            cache_key = (self.config_path.resolve(), self.config_path.stat().st_mtime)
+            cached = self._CACHE.get(cache_key)
+            if cached is not None:
+                self._config = cached
+                return cached
+
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                config = yaml.load(f, Loader=_YamlLoader)
+                self._validate(config)
                 self._config = config
+                self._CACHE[cache_key] = config
                 return config
         except FileNotFoundError:
             raise ConfigValidationError(f"Config file not found at {self.config_path}")
         except yaml.YAMLError as e:
             raise ConfigValidationError(f"YAML parsing error: {str(e)}")
 
-    def _validate_structure(self, config: Dict) -> None:
-        """验证配置结构"""
-        required_sections = {'event_hubs'}
-        missing = required_sections - config.keys()
+    def _validate(self, config: Dict) -> None:
+        """单遍完成结构与取值校验，遇错即抛"""
+        missing = _REQUIRED_SECTIONS - config.keys()
         if missing:
             raise ConfigValidationError(f"Missing required sections: {', '.join(missing)}")
 
-        for hub in config.get('event_hubs', []):
-            required_fields = {'name', 'connection_str', 'consumer_group', 'partitions'}
-            missing = required_fields - hub.keys()
+        event_hubs = config['event_hubs']
+        if not isinstance(event_hubs, list):
+            raise ConfigValidationError("event_hubs must be a list")
+
+        for hub in event_hubs:
+            missing = _REQUIRED_HUB_FIELDS - hub.keys()
             if missing:
                 raise ConfigValidationError(f"Event hub {hub.get('name')} missing fields: {', '.join(missing)}")
 
-    def _validate_values(self, config: Dict) -> None:
-        """验证配置值有效性"""
-        if not isinstance(config['event_hubs'], list):
-            raise ConfigValidationError("event_hubs must be a list")
-            
-        for hub in config['event_hubs']:
-            if hub['partitions'] <= 0:
-                raise ConfigValidationError(f"Invalid partitions number for {hub['name']}")
+            name, partitions = _hub_getter(hub)
+            if partitions <= 0:
+                raise ConfigValidationError(f"Invalid partitions number for {name}")
             if 'local_checkpoint_dir' not in hub:
-                raise ConfigValidationError(f"Missing local_checkpoint_dir for {hub['name']}")
+                raise ConfigValidationError(f"Missing local_checkpoint_dir for {name}")
             if not isinstance(hub['local_checkpoint_dir'], str):
                 raise ConfigValidationError("local_checkpoint_dir must be string")
\ No newline at end of file
@@ -2,6 +2,13 @@
 from functools import wraps
 from typing import Callable, Any
 
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
 class EventHubError(Exception):
     """事件中心基础异常"""
     def __init__(self, message: str, context: dict = None):
@@ -15,6 +22,12 @@ class ConnectivityError(EventHubError):
 class ProcessingError(EventHubError):
     """消息处理异常"""
     pass
+
+class RetryAfterError(EventHubError):
+    """服务端限流，要求等待指定秒数后重试"""
+    def __init__(self, message: str, seconds: float, context: dict = None):
+        super().__init__(message, context)
+        self.seconds = seconds
 class ConfigValidationError(Exception):
     """配置验证异常基类"""
     pass
@@ -23,22 +36,29 @@ def error_handler(max_retries: int = 3) -> Callable:
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         async def wrapper(*args, **kwargs) -> Any:
-            retries = 0
-            while retries < max_retries:
-                try:
-                    return await func(*args, **kwargs)
-                except ConnectivityError as e:
-                    args[0].logger.error(
-                        f"Connection error (attempt {retries+1}/{max_retries}): {str(e)}",
-                        extra=e.context
-                    )
-                    retries += 1
-                except ProcessingError as e:
-                    args[0].logger.error(
-                        f"Processing failed: {str(e)}",
-                        extra=e.context
-                    )
-                    raise
-            raise ConnectivityError(f"Max retries ({max_retries}) exceeded")
+            def _log_retry(retry_state):
+                exc = retry_state.outcome.exception()
+                args[0].logger.error(
+                    f"Connection error (attempt {retry_state.attempt_number}/{max_retries}): {str(exc)}",
+                    extra=exc.context
+                )
+
+            try:
+                # 指数退避+随机抖动，避免N个分区进程同时重连风暴
+                async for attempt in AsyncRetrying(
+                    retry=retry_if_exception_type(ConnectivityError),
+                    stop=stop_after_attempt(max_retries),
+                    wait=wait_random_exponential(multiplier=0.5, max=10),
+                    before_sleep=_log_retry,
+                    reraise=True,
+                ):
+                    with attempt:
+                        return await func(*args, **kwargs)
+            except ProcessingError as e:
+                args[0].logger.error(
+                    f"Processing failed: {str(e)}",
+                    extra=e.context
+                )
+                raise
         return wrapper
     return decorator
\ No newline at end of file
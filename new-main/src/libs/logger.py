@@ -1,5 +1,6 @@
 import os
 import logging
+import multiprocessing
 import sys
 from logging.handlers import RotatingFileHandler
 from typing import Optional
@@ -36,13 +37,13 @@ class EventHubLogger:
             backupCount=5
         )
         file_handler.setFormatter(formatter)
-
-        # 控制台处理器
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(formatter)
-
         self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+
+        # 控制台处理器：仅父进程输出，避免N个子进程争抢同一stdout
+        if multiprocessing.parent_process() is None:
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(formatter)
+            self.logger.addHandler(console_handler)
 
     @classmethod
     def get_logger(cls, name: Optional[str] = None) -> logging.Logger:
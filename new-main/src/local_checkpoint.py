@@ -1,16 +1,28 @@
+import asyncio
 import json
+import os
 from pathlib import Path
-import aiofiles
 from azure.eventhub import CheckpointStore  # 直接导入基类
 from typing import List, Dict, Any
 
+# 检查点落盘间隔（秒）：中间偏移量是纯浪费，只写最新值
+_FLUSH_INTERVAL = 0.5
+
 class FileCheckpointStore(CheckpointStore):
     def __init__(self, storage_dir: str, eventhub_name: str, consumer_group: str):
         self.base_dir = Path(storage_dir) / eventhub_name / consumer_group
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        self._pending: Dict[str, Dict] = {}
+        self._flush_task = None
+        self._part_dirs: Dict[str, Path] = {}
+        self._created_dirs = set()
 
     def _get_partition_dir(self, partition_id: str) -> Path:
-        return self.base_dir / f"partition_{partition_id}"
+        part_dir = self._part_dirs.get(partition_id)
+        if part_dir is None:
+            part_dir = self.base_dir / f"partition_{partition_id}"
+            self._part_dirs[partition_id] = part_dir
+        return part_dir
 
     async def list_ownership(self, fully_qualified_namespace: str, eventhub_name: str, consumer_group: str) -> List[Dict]:
         """实现所有权列表查询（根据实际需求完善）"""
@@ -21,12 +33,29 @@ class FileCheckpointStore(CheckpointStore):
         return []
 
     async def update_checkpoint(self, checkpoint: Dict):
-        partition_dir = self._get_partition_dir(checkpoint['partition_id'])
-        partition_dir.mkdir(exist_ok=True)
-        
+        # 检查点单调递增，内存中仅保留每分区最新值，由后台任务定期落盘
+        self._pending[checkpoint['partition_id']] = checkpoint
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while self._pending:
+            await asyncio.sleep(_FLUSH_INTERVAL)
+            pending, self._pending = self._pending, {}
+            for partition_id, checkpoint in pending.items():
+                await asyncio.to_thread(self._write_sync, partition_id, checkpoint)
+
+    def _write_sync(self, partition_id: str, checkpoint: Dict):
+        partition_dir = self._get_partition_dir(partition_id)
+        # 目录只需创建一次，后续写入省掉stat系统调用
+        if partition_id not in self._created_dirs:
+            partition_dir.mkdir(exist_ok=True)
+            self._created_dirs.add(partition_id)
         file_path = partition_dir / "checkpoint.json"
-        async with aiofiles.open(file_path, 'w') as f:
-            await f.write(json.dumps({
+        tmp_path = partition_dir / "checkpoint.json.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(json.dumps({
                 "offset": checkpoint['offset'],
                 "sequence_number": checkpoint['sequence_number']
-            }))
\ No newline at end of file
+            }))
+        os.replace(tmp_path, file_path)  # 原子替换，避免半写损坏
\ No newline at end of file
@@ -1,9 +1,17 @@
+import asyncio
 from pathlib import Path
 import sys
 from libs.config_loader import ConfigLoader, ConfigValidationError
 from managers.process_manager import EventHubManager
 from system.controller import ApplicationController
 
+# 预先导入重量级模块：fork出的子进程通过写时复制直接共享，
+# 避免每个分区进程重复导入及重新解析me_type_mapper.json
+import yaml  # noqa: F401
+import azure.eventhub  # noqa: F401
+import processor.sub.mapping  # noqa: F401
+import processor.custom_processor  # noqa: F401
+
 
 def main():
     try:
@@ -18,7 +26,8 @@ def main():
             # processor = CustomProcessor(config)  # 🎯 初始化处理器
             
             # 创建管理器并关联处理器
-            manager = EventHubManager(hub_config)  # 修改构造函数以接收处理器
+            # 附带已解析的全量配置，子进程处理器可直接复用
+            manager = EventHubManager({**hub_config, "_preloaded_config": config})
             managers.append(manager)
         
         # 启动所有处理器
@@ -27,7 +36,7 @@ def main():
             
         # 启动控制循环
         controller = ApplicationController(managers)
-        controller.run()
+        asyncio.run(controller.run())
         
     except ConfigValidationError as e:
         print(f"Configuration error: {str(e)}", file=sys.stderr)
@@ -1,24 +1,44 @@
 # ==== file: managers/process_manager.py ====
 import os
 import time
+import multiprocessing
 from multiprocessing import Process
 from typing import List, Dict
 import asyncio
 from services.eventhub_consumer import EventHubConsumer
 
+# 优先使用fork：子进程通过写时复制共享父进程已加载的模块与配置
+# （Windows等平台不支持fork，回退到默认的spawn）
+if "fork" in multiprocessing.get_all_start_methods():
+    _mp_context = multiprocessing.get_context("fork")
+else:
+    _mp_context = multiprocessing.get_context()
 
-class PartitionProcess(Process):
-    def __init__(self, consumer_config: Dict):
+
+class PartitionProcess(_mp_context.Process):
+    def __init__(self, base_config: Dict, partition_id: int):
         super().__init__()
-        self.consumer_config = consumer_config
+        # 所有分区共享同一份基础配置引用，fork后经写时复制继承
+        self.base_config = base_config
+        self.partition_id = partition_id
+        self.consumer_config = None
         self.daemon = True
 
     def run(self) -> None:
         """进程入口点"""
         try:
+            # 可选加速：uvloop对AMQP套接字I/O有2-4倍提升
+            try:
+                import uvloop
+                uvloop.install()
+            except ImportError:
+                pass
+
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
-            
+
+            # 延迟到子进程内合并分区号，父进程无需为每个分区复制配置
+            self.consumer_config = {**self.base_config, "partition_id": self.partition_id}
             consumer = self._create_consumer()
             loop.run_until_complete(consumer.run())
         finally:
@@ -36,8 +56,7 @@ class EventHubManager:
     def start(self) -> None:
         """启动事件中心处理"""
         for partition_id in range(self.config['partitions']):
-            process_config = self._build_process_config(partition_id)
-            process = PartitionProcess(process_config)
+            process = PartitionProcess(self.config, partition_id)
             process.start()
             # process.run()
             self.processes.append(process)
@@ -49,13 +68,6 @@ class EventHubManager:
                 process.terminate()
                 process.join()
 
-    def _build_process_config(self, partition_id: int) -> Dict:
-        """构建进程配置"""
-        return {
-            **self.config,
-            "partition_id": partition_id,
-        }
-
     def monitor(self) -> Dict:
         """监控进程状态"""
         return {
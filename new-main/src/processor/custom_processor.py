@@ -3,10 +3,19 @@ import json
 import re
 import os
 import asyncio
+import time
+from collections import defaultdict
 from json import JSONDecodeError
 from datetime import datetime, timezone
 from typing import List, Dict, Optional, Any
 
+try:
+    import orjson  # C实现，解析/序列化日志体显著更快
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
 from libs.config_loader import ConfigLoader
 from libs.logger import EventHubLogger
 from services.logs_sender import LogSender
@@ -14,15 +23,16 @@ from processor.event_processor import IEventProcessor
 from processor.sub.metadata_engine import MetadataEngine
 from processor.sub.mapping import (
     extract_resource_id_attributes,
-    extract_severity,
-    azure_properties_names
+    extract_severity
 )
 from processor.sub.monitored_entity_id import infer_monitored_entity_id
 
 class CustomProcessor(IEventProcessor):
-    def __init__(self):
-        config_loader = ConfigLoader()
-        config = config_loader.load()
+    def __init__(self, config: Optional[Dict] = None):
+        # 父进程可通过"_preloaded_config"传入已解析配置，避免子进程重复加载
+        if config is None:
+            config_loader = ConfigLoader()
+            config = config_loader.load()
         self.logger = EventHubLogger.get_logger("CustomProcessor")
         self.sender = LogSender(config)  # 注入配置初始化的发送器
         
@@ -30,33 +40,55 @@ class CustomProcessor(IEventProcessor):
         self.attribute_limit = config["log_processing"]["attribute_value_length_limit"]
         self.content_limit = config["log_processing"]["content_length_limit"]
         self.truncated_mark = config["log_processing"]["content_truncated_mark"]
+        self._trunc_mark_len = len(self.truncated_mark)
         
         self.metadata_engine = MetadataEngine()
         self._init_time_formats()
 
+        # 解析计数按分区累计，定期汇总输出
+        self._log_counts = defaultdict(int)
+        self._last_count_log = time.monotonic()
+
     def _init_time_formats(self):
-        """预编译时间戳正则表达式"""
-        self.time_patterns = [
-            re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}"),  # ISO格式
-            re.compile(r"\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2}")  # 月/日/年格式
-        ]
+        """预编译时间戳正则及对应解析格式"""
+        # 单次扫描：命名分组区分ISO格式与月/日/年格式
+        self._time_regex = re.compile(
+            r"(?P<iso>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})"
+            r"|(?P<us>\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2})"
+        )
+        self._time_formats = {
+            "iso": "%Y-%m-%d %H:%M:%S",
+            "us": "%m/%d/%Y %H:%M:%S",
+        }
+
+    # 解析计数汇总输出间隔（秒）
+    _LOG_SUMMARY_INTERVAL = 5.0
 
     async def process(self, partition_context, event: dict) -> None:
         """处理事件主流程"""
         try:
             logs = self.extract_logs(event)
             if logs:
-                self.logger.info(
-                    "Parsed %d valid logs from partition %s",
-                    len(logs),
-                    partition_context.partition_id,
-                    extra={"partition": partition_context.partition_id}
-                )
+                self._count_parsed_logs(partition_context.partition_id, len(logs))
                 await self._send_logs_safely(logs)
         except Exception as e:
             self._log_processing_error(partition_context, e)
             raise
 
+    def _count_parsed_logs(self, partition_id: str, count: int) -> None:
+        """累计解析计数，定期汇总为一条INFO，避免逐事件格式化开销"""
+        self._log_counts[partition_id] += count
+        now = time.monotonic()
+        if now - self._last_count_log >= self._LOG_SUMMARY_INTERVAL:
+            self.logger.info(
+                "Parsed %d valid logs in last %.1fs (per partition: %s)",
+                sum(self._log_counts.values()),
+                now - self._last_count_log,
+                dict(self._log_counts)
+            )
+            self._log_counts.clear()
+            self._last_count_log = now
+
     async def _send_logs_safely(self, logs: List[Dict]) -> None:
         """带异常处理的日志发送"""
         try:
@@ -85,7 +117,7 @@ class CustomProcessor(IEventProcessor):
     def _parse_event_body(self, body: str) -> List[Dict]:
         """解析事件体为JSON"""
         try:
-            return json.loads(body).get("records", [])
+            return _json_loads(body).get("records", [])
         except JSONDecodeError as e:
             return self._attempt_fallback_parsing(body, e)
 
@@ -102,8 +134,7 @@ class CustomProcessor(IEventProcessor):
         """处理单条日志记录"""
         try:
             self._deserialize_properties(record)
-            parsed = self._build_parsed_record(record)
-            return self._apply_field_limits(parsed)
+            return self._build_parsed_record(record)
         except Exception as e:
             self._log_record_error(record, e)
             return None
@@ -123,8 +154,9 @@ class CustomProcessor(IEventProcessor):
         # 推断监控实体
         category = record.get("category", "").lower()
         infer_monitored_entity_id(category, parsed)
-        
-        return parsed
+
+        # 原地截断：各辅助函数都写入同一个字典，整条记录只分配一次
+        return self._apply_field_limits(parsed)
 
     def _extract_resource_info(self, record: Dict, parsed: Dict) -> None:
         """提取Azure资源信息"""
@@ -138,42 +170,50 @@ class CustomProcessor(IEventProcessor):
 
     def _parse_datetime(self, timestamp: str) -> str:
         """智能时间戳解析"""
-        for pattern in self.time_patterns:
-            if pattern.match(timestamp):
-                try:
-                    dt = datetime.strptime(timestamp, self._get_format(pattern))
-                    return dt.isoformat(timespec="milliseconds")
-                except ValueError:
-                    continue
+        match = self._time_regex.match(timestamp)
+        if match:
+            try:
+                dt = datetime.strptime(timestamp, self._time_formats[match.lastgroup])
+                return dt.isoformat(timespec="milliseconds")
+            except ValueError:
+                pass
         return datetime.now(timezone.utc).isoformat()
 
-    def _get_format(self, pattern: re.Pattern) -> str:
-        """根据正则匹配返回对应时间格式"""
-        return "%Y-%m-%d %H:%M:%S" if "202" in pattern.pattern else "%m/%d/%Y %H:%M:%S"
+    # 无需截断、仅保证为字符串的字段
+    _PASSTHROUGH_FIELDS = frozenset({"severity", "timestamp"})
 
     def _apply_field_limits(self, record: Dict) -> Dict:
-        """应用字段长度限制"""
-        return {
-            key: self._truncate_value(key, value)
-            for key, value in record.items()
-        }
-
-    def _truncate_value(self, key: str, value: Any) -> str:
-        """字段值截断处理"""
-        if key == "content":
-            return self._truncate_content(value)
-            
-        if key in ["severity", "timestamp"]:
-            return str(value)
-            
-        return self._truncate_generic_field(value)
+        """应用字段长度限制（原地修改，避免额外字典分配）"""
+        attribute_limit = self.attribute_limit
+        for key, value in record.items():
+            if key == "content":
+                record[key] = self._truncate_content(value)
+            elif key in self._PASSTHROUGH_FIELDS:
+                if not isinstance(value, str):
+                    record[key] = str(value)
+            elif not (isinstance(value, str) and len(value) <= attribute_limit):
+                record[key] = self._truncate_generic_field(value)
+        return record
 
     def _truncate_content(self, content: Any) -> str:
         """内容字段特殊处理"""
-        content_str = json.dumps(content) if not isinstance(content, str) else content
-        if len(content_str) > self.content_limit:
-            return content_str[:self.content_limit - len(self.truncated_mark)] + self.truncated_mark
-        return content_str
+        limit = self.content_limit
+        if isinstance(content, str):
+            if len(content) <= limit:
+                return content
+            return content[:limit - self._trunc_mark_len] + self.truncated_mark
+
+        if orjson is not None:
+            raw = orjson.dumps(content)
+            if len(raw) <= limit:
+                return raw.decode()
+            # 字节级截断可能切断多字节字符，忽略残缺尾部
+            return raw[:limit - self._trunc_mark_len].decode(errors="ignore") + self.truncated_mark
+
+        content_str = json.dumps(content)
+        if len(content_str) <= limit:
+            return content_str
+        return content_str[:limit - self._trunc_mark_len] + self.truncated_mark
 
     def _truncate_generic_field(self, value: Any) -> str:
         """通用字段截断"""
@@ -184,10 +224,16 @@ class CustomProcessor(IEventProcessor):
 
     def _deserialize_properties(self, record: Dict) -> None:
         """反序列化properties字段"""
-        prop_key = next((k for k in azure_properties_names if k in record), None)
+        # azure_properties_names仅两项，显式展开避免生成器+next开销
+        if "properties" in record:
+            prop_key = "properties"
+        elif "EventProperties" in record:
+            prop_key = "EventProperties"
+        else:
+            prop_key = None
         if prop_key and isinstance(record.get(prop_key), str):
             try:
-                record[prop_key] = json.loads(record[prop_key])
+                record[prop_key] = _json_loads(record[prop_key])
             except JSONDecodeError:
                 pass
 
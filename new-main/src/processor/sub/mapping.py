@@ -1,5 +1,8 @@
 import json
+import logging
 import os
+import re
+from types import MappingProxyType
 from typing import Dict
 
 from libs.logger import EventHubLogger
@@ -24,7 +27,7 @@ log_level_to_severity_dict = {
 
 severity_to_log_level_dict = {v: k for k, v in log_level_to_severity_dict.items()}
 
-azure_level_properties = ['Level', 'level']
+azure_level_properties = ('Level', 'level')
 azure_properties_names = ['properties', 'EventProperties']
 activity_log_categories = ['alert', 'administrative', 'resourcehealth', 'servicehealth', 'security', 'policy', 'recommendation', 'autoscale']
 
@@ -45,7 +48,7 @@ try:
             dt_me_type_mapper.update({key: resource_type_to_me_type["meType"]})
             
         logger.debug("ME type mapping loaded", extra={"mapping_count": len(dt_me_type_mapper)})
-        
+
 except Exception as e:
     logger.error(
         "Failed to load ME type mapping file",
@@ -57,78 +60,73 @@ except Exception as e:
     )
     dt_me_type_mapper = {}
 
+# 冻结为只读映射：fork后作为共享页驻留，热路径只做dict.get查询
+dt_me_type_mapper = MappingProxyType(dt_me_type_mapper)
+
+# 单次C级扫描提取订阅/资源组/provider尾段，替代逐段casefold比较
+_RESOURCE_ID_RE = re.compile(
+    r"^/?subscriptions/([^/]+)/resourcegroups/([^/]+)/providers/(.+)$",
+    re.IGNORECASE
+)
+
 def extract_resource_id_attributes(parsed_record: Dict, resource_id: str):
     """
     增强版资源ID解析（添加错误跟踪和调试信息）
     """
     try:
         parsed_record[RESOURCE_ID_ATTRIBUTE] = resource_id
-        parts = resource_id.lstrip("/").split("/")
 
-        logger.debug(
-            "Processing resource ID",
-            extra={"resource_id_sample": resource_id[:200]}
-        )
+        # 热路径：仅在DEBUG级别才构造extra字典与样本切片
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Processing resource ID",
+                extra={"resource_id_sample": resource_id[:200]}
+            )
 
-        # 验证资源ID结构
-        if len(parts) < 7:
+        # 验证资源ID结构（单次正则匹配覆盖前缀/分组/provider段检查）
+        match = _RESOURCE_ID_RE.match(resource_id)
+        if not match:
             logger.warning(
                 "Invalid resource ID structure",
-                extra={
-                    "reason": "insufficient_parts",
-                    "part_count": len(parts),
-                    "resource_id_sample": resource_id[:200]
-                }
+                extra={"resource_id_sample": resource_id[:200]}
             )
             return
-            
-        if parts[0].casefold() != "subscriptions":
+
+        provider_tail = match.group(3).split("/")
+        if len(provider_tail) < 2:
             logger.warning(
-                "Invalid resource ID prefix",
+                "Invalid resource ID structure",
                 extra={
-                    "expected": "subscriptions",
-                    "actual": parts[0].lower(),
+                    "reason": "insufficient_parts",
+                    "part_count": len(provider_tail) + 5,
                     "resource_id_sample": resource_id[:200]
                 }
             )
             return
 
-        if parts[2].casefold() != "resourcegroups":
-            logger.warning(
-                "Missing resource groups section",
-                extra={"resource_id_sample": resource_id[:200]}
-            )
-            return
-
-        if parts[4].casefold() != "providers":
-            logger.warning(
-                "Missing providers section",
-                extra={"resource_id_sample": resource_id[:200]}
-            )
-            return
-
         # 提取订阅信息
-        parsed_record[SUBSCRIPTION_ATTRIBUTE] = parts[1]
-        parsed_record[RESOURCE_GROUP_ATTRIBUTE] = parts[3]
-        parsed_record[RESOURCE_NAME_ATTRIBUTE] = parts[-1]
+        parsed_record[SUBSCRIPTION_ATTRIBUTE] = match.group(1)
+        parsed_record[RESOURCE_GROUP_ATTRIBUTE] = match.group(2)
+        parsed_record[RESOURCE_NAME_ATTRIBUTE] = provider_tail[-1]
 
         # 处理资源类型层级
-        resource_type_parts_with_parent = parts[5:-1]
+        resource_type_parts_with_parent = provider_tail[:-1]
         resource_type_parts = [
-            part for index, part 
-            in enumerate(resource_type_parts_with_parent) 
+            part for index, part
+            in enumerate(resource_type_parts_with_parent)
             if (index == 0 or index % 2 != 0)
         ]
         parsed_record[RESOURCE_TYPE_ATTRIBUTE] = "/".join(resource_type_parts)
-        
-        logger.debug(
-            "Successfully parsed resource ID",
-            extra={
-                "subscription": parts[1],
-                "resource_group": parts[3],
-                "resource_type": parsed_record[RESOURCE_TYPE_ATTRIBUTE]
-            }
-        )
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Successfully parsed resource ID",
+                extra={
+                    "subscription": match.group(1),
+                    "resource_group": match.group(2),
+                    "resource_type": parsed_record[RESOURCE_TYPE_ATTRIBUTE]
+                }
+            )
 
     except Exception as e:
         logger.error(
@@ -144,19 +142,20 @@ def extract_severity(record: Dict, parsed_record: Dict):
     """增强版严重性提取"""
     try:
         level_property = next(
-            (level for level in azure_level_properties 
-             if level in record.keys()), 
+            (level for level in azure_level_properties
+             if level in record),
             None
         )
-        
+
         if level_property:
             map_to_severity(record, parsed_record, level_property)
         else:
             parsed_record["severity"] = DEFAULT_SEVERITY_INFO
-            logger.debug(
-                "Using default severity level",
-                extra={"default_severity": DEFAULT_SEVERITY_INFO}
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Using default severity level",
+                    extra={"default_severity": DEFAULT_SEVERITY_INFO}
+                )
             
     except Exception as e:
         logger.error(
@@ -174,20 +173,22 @@ def map_to_severity(record: Dict, parsed_record: Dict, level_property: str):
         if isinstance(raw_value, int):
             severity = log_level_to_severity_dict.get(raw_value, DEFAULT_SEVERITY_INFO)
             parsed_record["severity"] = severity
-            
-            logger.info(
-                "Mapped integer severity level",
-                extra={
-                    "original_value": raw_value,
-                    "mapped_severity": severity
-                }
-            )
+
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Mapped integer severity level",
+                    extra={
+                        "original_value": raw_value,
+                        "mapped_severity": severity
+                    }
+                )
         else:
             parsed_record["severity"] = raw_value
-            logger.debug(
-                "Using string severity value",
-                extra={"severity_value": raw_value}
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Using string severity value",
+                    extra={"severity_value": raw_value}
+                )
             
         # 验证有效性
         if parsed_record["severity"] not in severity_to_log_level_dict:
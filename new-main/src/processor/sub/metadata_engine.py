@@ -2,8 +2,7 @@ import json
 import os
 import re
 from dataclasses import dataclass
-from os import listdir
-from os.path import isfile
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 
@@ -16,43 +15,29 @@ from .mapping import RESOURCE_TYPE_ATTRIBUTE
 # 初始化日志记录器
 logger = EventHubLogger.get_logger("MetadataEngine")
 
-# region 比较器函数
-def _eq_comparator(x, y) -> bool:
-    """Case-insensitive equality check"""
-    return str(x).casefold() == str(y).casefold()
-
-def _in_comparator(x, y) -> bool:
-    """Case-insensitive contains check"""
-    return str(x).casefold() in str(y).casefold().split(',')
-
-def _prefix_comparator(x, y) -> bool:
-    """Case-insensitive prefix match"""
-    return str(x).casefold().startswith(str(y).casefold())
-
-def _contains_comparator(x, y) -> bool:
-    """Case-insensitive substring match"""
-    return str(y).casefold() in str(x).casefold()
-
+# region 比较器
+# 操作数在构造时已casefold并拆分，比较器只处理已折叠的待匹配值
 _CONDITION_COMPARATOR_MAP = {
-    "$eq".casefold(): _eq_comparator,
-    "$in".casefold(): _in_comparator,
-    "$prefix".casefold(): _prefix_comparator,
-    "$contains".casefold(): _contains_comparator,
+    "$eq": "_match_eq",
+    "$in": "_match_in",
+    "$prefix": "_match_prefix",
+    "$contains": "_match_contains",
 }
-# endregion
 
-# region 值提取函数
-def _extract_resource_type(record: Dict, parsed_record: Dict) -> str:
-    """Extract resource type from parsed record"""
-    return parsed_record.get(RESOURCE_TYPE_ATTRIBUTE, "")
+# 匹配器成本排名：越小越便宜/选择性越强
+_OPERATOR_COST = {"$eq": 0, "$prefix": 1, "$in": 2, "$contains": 3}
 
-def _extract_category(record: Dict, parsed_record: Dict) -> str:
-    """Extract category from original record"""
-    return record.get("category", "")
+# 单遍解析条件宏：组1为操作符，组2为括号内的操作数串
+_CONDITION_RE = re.compile(r"^(\$eq|\$in|\$prefix|\$contains)\s*\((.*)\)\s*$",
+                           re.IGNORECASE | re.DOTALL)
+_QUOTED_OPERAND_RE = re.compile(r"'(.*?)'", re.DOTALL)
+# endregion
 
+# region 值提取定位
+# (来源侧, 键名)：匹配时直接对相应字典做一次get，省去包装函数调用
 _SOURCE_VALUE_EXTRACTOR_MAP = {
-    "resourceType".casefold(): _extract_resource_type,
-    "category".casefold(): _extract_category
+    "resourcetype": ("parsed", RESOURCE_TYPE_ATTRIBUTE),
+    "category": ("raw", "category"),
 }
 # endregion
 
@@ -62,6 +47,7 @@ class Attribute:
     """Represents a metadata attribute mapping"""
     key: str
     pattern: str
+    compiled: Any  # 配置加载时预编译的JMESPath表达式
 
 @dataclass(frozen=True)
 class ConfigRule:
@@ -73,29 +59,49 @@ class ConfigRule:
 
 class SourceMatcher:
     """Handles source matching logic"""
+
+    # 实例数量可达数千（规则×匹配器），槽位布局省内存且属性访问更快
+    __slots__ = ('source', 'condition', 'valid', 'operator', '_evaluator',
+                 '_operand', '_operand_cf', '_operand_parts',
+                 '_source_side', '_source_key')
+
     def __init__(self, source: str, condition: str):
         self.source = source
         self.condition = condition
         self.valid = True
+        self.operator = None
         self._evaluator = None
         self._operand = None
-        self._source_value_extractor = None
+        self._source_side = None
+        self._source_key = None
 
-        # 解析条件表达式
-        for key in _CONDITION_COMPARATOR_MAP:
-            if condition.startswith(key):
-                self._evaluator = _CONDITION_COMPARATOR_MAP[key]
-                break
+        # 单次正则同时解析操作符与操作数
+        operands = []
+        cond_match = _CONDITION_RE.match(condition)
+        if cond_match:
+            self.operator = cond_match.group(1).casefold()
+            operands = _QUOTED_OPERAND_RE.findall(cond_match.group(2))
 
-        # 提取操作数
-        operands = re.findall(r"'(.*?)'", condition, re.DOTALL)
+        # casefold与按逗号拆分只在构造时做一次
         self._operand = ','.join(operands) if operands else None
-        
-        # 获取值提取器
-        self._source_value_extractor = _SOURCE_VALUE_EXTRACTOR_MAP.get(source.casefold())
+        if self._operand is not None:
+            self._operand_cf = self._operand.casefold()
+            self._operand_parts = tuple(part.casefold() for part in self._operand.split(','))
+        else:
+            self._operand_cf = None
+            self._operand_parts = ()
+
+        # 绑定比较器方法
+        if self.operator:
+            self._evaluator = getattr(self, _CONDITION_COMPARATOR_MAP[self.operator])
+
+        # 定位值来源（原始记录或解析结果中的具体键）
+        locator = _SOURCE_VALUE_EXTRACTOR_MAP.get(source.casefold())
+        if locator:
+            self._source_side, self._source_key = locator
 
         # 有效性验证
-        if not self._source_value_extractor:
+        if not self._source_side:
             logger.warning("Unsupported source type", 
                          extra={"source": source, "event_id": "unsupported-source-type-warning"})
             self.valid = False
@@ -110,82 +116,239 @@ class SourceMatcher:
         if not self.valid:
             return False
         try:
-            value = self._source_value_extractor(record, parsed_record)
-            return self._evaluator(value, self._operand)
+            source_dict = parsed_record if self._source_side == "parsed" else record
+            value = source_dict.get(self._source_key, "")
+            return self._evaluator(str(value).casefold())
         except Exception as e:
             logger.error("Matching failed",
                        extra={"source": self.source, "error": str(e)},
                        exc_info=True)
             return False
 
+    def _match_eq(self, value_cf: str) -> bool:
+        """Case-insensitive equality check"""
+        return value_cf == self._operand_cf
+
+    def _match_in(self, value_cf: str) -> bool:
+        """Case-insensitive membership check"""
+        return value_cf in self._operand_parts
+
+    def _match_prefix(self, value_cf: str) -> bool:
+        """Case-insensitive prefix match"""
+        return value_cf.startswith(self._operand_cf)
+
+    def _match_contains(self, value_cf: str) -> bool:
+        """Case-insensitive substring match"""
+        return self._operand_cf in value_cf
+
+# region 规则构建（模块级，便于跨引擎实例缓存）
+@lru_cache(maxsize=1)
+def _load_all_configs(config_dir_key: str, dir_mtime: float):
+    """扫描目录并构建全部规则；mtime参与缓存键，配置变更自动失效"""
+    rules: List[ConfigRule] = []
+    default_rule: Optional[ConfigRule] = None
+    config_dir = Path(config_dir_key)
+
+    # scandir的DirEntry缓存文件类型，每个条目只需一次stat
+    with os.scandir(config_dir) as entries:
+        config_files = [
+            Path(entry.path) for entry in entries
+            if entry.is_file() and entry.name.endswith(".json")
+        ]
+
+    for cfg_path in config_files:
+        try:
+            with open(cfg_path) as f:
+                config = json.load(f)
+
+            if config.get("name") == "default":
+                default_rule = _create_config_rule("default", config)
+            else:
+                rules.extend(_process_config(config))
+
+            logger.debug("Config loaded", extra={"file": cfg_path.name})
+        except Exception as e:
+            logger.error("Config file error",
+                       extra={"file": str(cfg_path), "error": str(e)},
+                       exc_info=True)
+
+    return tuple(rules), default_rule
+
+
+def _process_config(config: Dict) -> List[ConfigRule]:
+    """处理单个配置文件"""
+    return [
+        _create_config_rule(config.get("name", "unnamed"), rule_def)
+        for rule_def in config.get("rules", [])
+        if (rule := _create_config_rule(config.get("name", "unnamed"), rule_def)) is not None
+    ]
+
+
+def _create_config_rule(entity_name: str, rule_def: Dict) -> Optional[ConfigRule]:
+    """创建配置规则实例"""
+    try:
+        sources = _create_sources(rule_def.get("sources", []))
+        attrs = _create_attributes(rule_def.get("attributes", []))
+
+        # 便宜的匹配器排前：不匹配的规则（多数情况）在首个匹配器即短路
+        sources.sort(key=lambda m: _OPERATOR_COST.get(m.operator, len(_OPERATOR_COST)))
+
+        if entity_name != "default" and not sources:
+            logger.warning("Invalid rule configuration",
+                         extra={"entity": entity_name, "reason": "no_valid_sources"})
+            return None
+
+        return ConfigRule(
+            entity_type_name=entity_name,
+            source_matchers=sources,
+            attributes=attrs
+        )
+    except Exception as e:
+        logger.error("Rule creation failed",
+                   extra={"entity": entity_name, "error": str(e)},
+                   exc_info=True)
+        return None
+
+
+def _create_sources(sources_def: List[Dict]) -> List[SourceMatcher]:
+    """创建源匹配器集合"""
+    valid_sources = []
+    for src in sources_def:
+        try:
+            matcher = SourceMatcher(src["source"], src["condition"])
+            if matcher.valid:
+                valid_sources.append(matcher)
+        except KeyError:
+            logger.warning("Invalid source definition",
+                         extra={"definition": str(src)[:200]})
+    return valid_sources
+
+
+def _create_attributes(attrs_def: List[Dict]) -> List[Attribute]:
+    """创建属性映射集合（JMESPath表达式在此预编译）"""
+    valid_attrs = []
+    for attr in attrs_def:
+        try:
+            key, pattern = attr["key"], attr["pattern"]
+        except KeyError:
+            logger.warning("Invalid attribute definition",
+                         extra={"definition": str(attr)[:200]})
+            continue
+        try:
+            compiled = jmespath.compile(pattern)
+        except Exception as e:
+            # 无效表达式加载时记录一次并剔除，避免逐条记录报错
+            logger.warning("JMESPath pattern compilation failed",
+                         extra={"attribute": key, "pattern": pattern, "error": str(e)})
+            continue
+        valid_attrs.append(Attribute(key, pattern, compiled))
+    return valid_attrs
+# endregion
+
+
 class MetadataEngine:
     """Main metadata processing engine"""
+
+    # 匹配结果缓存上限（条目为(resourceType, category)元组）
+    _MATCH_CACHE_MAX = 4096
+
     def __init__(self):
         self.rules: List[ConfigRule] = []
         self.default_rule: Optional[ConfigRule] = None
         self._load_configs()
+        self._build_rule_index()
+        # 匹配器只读取resourceType/category，结果可按该键安全记忆
+        self._match_cache: Dict[tuple, Optional[ConfigRule]] = {}
+
+    def _build_rule_index(self):
+        """为纯$eq规则建立(resourceType, category)哈希索引，其余规则保留线性扫描"""
+        self._eq_index: Dict[tuple, ConfigRule] = {}
+        self._complex_rules: List[ConfigRule] = []
+        for rule in self.rules:
+            key = self._eq_index_key(rule)
+            if key is not None:
+                # 先加载的规则优先，与原线性扫描顺序一致
+                self._eq_index.setdefault(key, rule)
+            else:
+                self._complex_rules.append(rule)
+
+    @staticmethod
+    def _eq_index_key(rule: ConfigRule) -> Optional[tuple]:
+        """规则若仅由单操作数$eq匹配器构成，返回其索引键，否则返回None"""
+        resource_type = category = None
+        for matcher in rule.source_matchers:
+            if matcher.operator != "$eq" or not matcher._operand or "," in matcher._operand:
+                return None
+            source = matcher.source.casefold()
+            if source == "resourcetype" and resource_type is None:
+                resource_type = matcher._operand.casefold()
+            elif source == "category" and category is None:
+                category = matcher._operand.casefold()
+            else:
+                return None
+        if resource_type is None and category is None:
+            return None
+        return (resource_type, category)
 
     def _load_configs(self):
-        """加载所有配置文件"""
+        """加载所有配置文件（同目录在进程内只解析构建一次）"""
         try:
             # 动态计算配置路径
             current_file = Path(__file__).absolute()
             project_root = current_file.parents[3]  # 根据实际目录结构调整
             config_dir = project_root / "config" / "config_rule"
-            
+
             if not config_dir.exists():
-                logger.error("Config directory missing", 
+                logger.error("Config directory missing",
                            extra={"path": str(config_dir)})
                 return
 
-            config_files = [
-                f for f in listdir(config_dir)
-                if isfile(config_dir / f) and f.endswith(".json")
-            ]
-            
-            for cfg_file in config_files:
-                self._load_single_config(config_dir / cfg_file)
-                
+            rules, default_rule = _load_all_configs(
+                str(config_dir), config_dir.stat().st_mtime
+            )
+            self.rules = list(rules)
+            self.default_rule = default_rule
+
         except Exception as e:
             logger.error("Config loading failed",
                        extra={"error": str(e)},
                        exc_info=True)
 
-    def _load_single_config(self, config_path: Path):
-        """加载单个配置文件"""
-        try:
-            with open(config_path) as f:
-                config = json.load(f)
-                
-                if config.get("name") == "default":
-                    self.default_rule = self._create_config_rule(
-                        entity_name="default",
-                        rule_def=config
-                    )
-                else:
-                    self.rules.extend(self._process_config(config))
-                    
-                logger.debug("Config loaded",
-                           extra={"file": config_path.name})
-                
-        except Exception as e:
-            logger.error("Config file error",
-                       extra={"file": str(config_path), "error": str(e)},
-                       exc_info=True)
-
     def apply(self, record: Dict, parsed_record: Dict):
         """应用元数据规则"""
         try:
-            # 尝试匹配所有规则
-            for rule in self.rules:
-                if self._is_rule_applicable(rule, record, parsed_record):
-                    self._apply_rule(rule, parsed_record, record)
-                    return
-            
+            resource_type = str(parsed_record.get(RESOURCE_TYPE_ATTRIBUTE, "")).casefold()
+            category = str(record.get("category", "")).casefold()
+            key = (resource_type, category)
+
+            if key in self._match_cache:
+                rule = self._match_cache[key]
+            else:
+                # O(1)索引命中：先查组合键，再查单维键
+                rule = (self._eq_index.get(key)
+                        or self._eq_index.get((resource_type, None))
+                        or self._eq_index.get((None, category)))
+
+                # 索引未命中时回退到复杂规则线性扫描
+                if rule is None:
+                    for candidate in self._complex_rules:
+                        if self._is_rule_applicable(candidate, record, parsed_record):
+                            rule = candidate
+                            break
+
+                # 未命中(None)同样记忆；规则在进程内不变，无需失效
+                if len(self._match_cache) >= self._MATCH_CACHE_MAX:
+                    self._match_cache.pop(next(iter(self._match_cache)))
+                self._match_cache[key] = rule
+
+            if rule is not None:
+                self._apply_rule(rule, parsed_record, record)
+                return
+
             # 回退到默认规则
             if self.default_rule:
                 self._apply_rule(self.default_rule, parsed_record, record)
-                
+
         except Exception as e:
             logger.error("Metadata processing failed",
                        extra={"error": str(e)},
@@ -199,7 +362,7 @@ class MetadataEngine:
         """执行规则映射"""
         for attr in rule.attributes:
             try:
-                value = jmespath.search(attr.pattern, raw_record, JMESPATH_OPTIONS)
+                value = attr.compiled.search(raw_record, options=JMESPATH_OPTIONS)
                 if value is not None:
                     parsed_record[attr.key] = value
             except Exception as e:
@@ -207,56 +370,3 @@ class MetadataEngine:
                            extra={"attribute": attr.key, "pattern": attr.pattern, "error": str(e)},
                            exc_info=True)
 
-    def _process_config(self, config: Dict) -> List[ConfigRule]:
-        """处理单个配置文件"""
-        return [
-            self._create_config_rule(config.get("name", "unnamed"), rule_def)
-            for rule_def in config.get("rules", [])
-            if (rule := self._create_config_rule(config.get("name", "unnamed"), rule_def)) is not None
-        ]
-
-    def _create_config_rule(self, entity_name: str, rule_def: Dict) -> Optional[ConfigRule]:
-        """创建配置规则实例"""
-        try:
-            sources = self._create_sources(rule_def.get("sources", []))
-            attrs = self._create_attributes(rule_def.get("attributes", []))
-            
-            if entity_name != "default" and not sources:
-                logger.warning("Invalid rule configuration",
-                             extra={"entity": entity_name, "reason": "no_valid_sources"})
-                return None
-                
-            return ConfigRule(
-                entity_type_name=entity_name,
-                source_matchers=sources,
-                attributes=attrs
-            )
-        except Exception as e:
-            logger.error("Rule creation failed",
-                       extra={"entity": entity_name, "error": str(e)},
-                       exc_info=True)
-            return None
-
-    def _create_sources(self, sources_def: List[Dict]) -> List[SourceMatcher]:
-        """创建源匹配器集合"""
-        valid_sources = []
-        for src in sources_def:
-            try:
-                matcher = SourceMatcher(src["source"], src["condition"])
-                if matcher.valid:
-                    valid_sources.append(matcher)
-            except KeyError:
-                logger.warning("Invalid source definition",
-                             extra={"definition": str(src)[:200]})
-        return valid_sources
-
-    def _create_attributes(self, attrs_def: List[Dict]) -> List[Attribute]:
-        """创建属性映射集合"""
-        valid_attrs = []
-        for attr in attrs_def:
-            try:
-                valid_attrs.append(Attribute(attr["key"], attr["pattern"]))
-            except KeyError:
-                logger.warning("Invalid attribute definition",
-                             extra={"definition": str(attr)[:200]})
-        return valid_attrs
\ No newline at end of file
@@ -1,5 +1,6 @@
 # ==== file: services/eventhub_consumer.py ====
 import asyncio
+import logging
 from azure.eventhub.aio import EventHubConsumerClient
 from typing import Dict, Any
 from local_checkpoint import FileCheckpointStore
@@ -18,7 +19,7 @@ class EventHubConsumer:
         self.config = config
         self.logger = EventHubLogger.get_logger(f"consumer.{config['name']}")
         self._client = None
-        self.processor = CustomProcessor()
+        self.processor = CustomProcessor(config.get("_preloaded_config"))
         
         # 初始化本地检查点存储
         self.checkpoint_store = FileCheckpointStore(
@@ -40,8 +41,6 @@ class EventHubConsumer:
 
     @error_handler(max_retries=3)
     async def process_message(self, partition_context, event) -> None:
-        print(f"Received event from partition {partition_context.partition_id}")
-
         """
         统一消息处理入口（由SDK自动调用）
         :param partition_context: 分区上下文对象
@@ -64,11 +63,12 @@ class EventHubConsumer:
             # 3. 更新检查点（仅在处理成功后）
             await partition_context.update_checkpoint(event)
             
-            # 4. 记录处理成功日志
-            self.logger.debug(
-                "Event processed successfully",
-                extra={"partition": partition_context.partition_id}
-            )
+            # 4. 记录处理成功日志（热路径，仅DEBUG级别才构造extra）
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "Event processed successfully",
+                    extra={"partition": partition_context.partition_id}
+                )
 
         except Exception as e:
             self.logger.error(
@@ -87,14 +87,60 @@ class EventHubConsumer:
                 }
             ) from e
 
+    @error_handler(max_retries=3)
+    async def process_message_batch(self, partition_context, events) -> None:
+        """
+        批量消息处理入口（由SDK自动调用）
+        整批处理成功后只提交一次检查点，摊薄逐事件回调与检查点开销
+        :param partition_context: 分区上下文对象
+        :param events: 本批原始事件列表
+        """
+        if not events:
+            return
+
+        try:
+            for event in events:
+                await self.processor.process(partition_context, event)
+
+            # 检查点单调递增，提交批内最后一个事件即可
+            await partition_context.update_checkpoint(events[-1])
+
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "Event batch processed successfully",
+                    extra={
+                        "partition": partition_context.partition_id,
+                        "batch_size": len(events)
+                    }
+                )
+
+        except Exception as e:
+            self.logger.error(
+                "Event batch processing failed",
+                extra={
+                    "partition": partition_context.partition_id,
+                    "error": str(e)
+                },
+                exc_info=True
+            )
+            raise ProcessingError(
+                message="Event batch processing failed",
+                context={
+                    "partition": partition_context.partition_id,
+                    "batch_size": len(events)
+                }
+            ) from e
+
     async def run(self) -> None:
         """
         启动消费者主循环
         """
         async with self.client:
-            await self.client.receive(
-                on_event=self.process_message
-               )
+            await self.client.receive_batch(
+                on_event_batch=self.process_message_batch,
+                max_batch_size=100,
+                max_wait_time=5
+            )
 
     async def graceful_shutdown(self) -> None:
         """
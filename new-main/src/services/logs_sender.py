@@ -1,16 +1,27 @@
 # ==== file: services/log_sender.py ====
-import gzip
 import json
 import asyncio
+import logging
+import random
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from typing import NamedTuple, Generator, List, Dict, Any, Optional
 from urllib.parse import urlparse
 import aiohttp
 # from libs.config_loader import AppConfig
+from libs.exceptions import RetryAfterError
 from libs.logger import EventHubLogger
 
+try:
+    import orjson  # C实现，直接产出bytes，省去UTF-8编码
+    _json_dumps_bytes = orjson.dumps
+except ImportError:
+    def _json_dumps_bytes(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
 class LogBatch(NamedTuple):
-    """日志批次数据容器"""
-    serialized_batch: str
+    """日志批次数据容器（批次体为已编码的JSON字节串）"""
+    serialized_batch: bytes
     number_of_logs: int
 
 class LogSender:
@@ -27,6 +38,15 @@ class LogSender:
         # 初始化SSL上下文
         self._ssl_context = self._create_ssl_context()
 
+        # HTTP会话跨send调用复用（懒加载，连接池+keep-alive）
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        # 压缩线程池：gzip不在事件循环内执行，避免阻塞其他协程
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.config['performance']['http']['concurrency'],
+            thread_name_prefix="log-gzip"
+        )
+
 
     def _build_endpoint_url(self) -> str:
         """构建完整的日志接入URL"""
@@ -40,6 +60,23 @@ class LogSender:
             return False
         return None  # 使用系统默认验证
 
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """获取复用的HTTP会话，首次调用时创建"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.config['performance']['http']['concurrency'],
+                    ttl_dns_cache=300,
+                    keepalive_timeout=60
+                )
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """关闭复用的HTTP会话"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
     async def send(self, logs: List[Dict]) -> bool:
         """发送日志主入口"""
         try:
@@ -52,57 +89,46 @@ class LogSender:
                 self.config['performance']['http']['concurrency']
             )
             
-            async with aiohttp.ClientSession() as session:
-                tasks = [
-                    self._process_batch(session, batch, semaphore)
-                    for batch in batches
-                ]
-                results = await asyncio.gather(*tasks)
-                
+            session = await self._get_session()
+            tasks = [
+                self._process_batch(session, batch, semaphore)
+                for batch in batches
+            ]
+            results = await asyncio.gather(*tasks)
+
             return all(results)
         except Exception as e:
             self.logger.critical("Fatal error in log sending", exc_info=True)
             return False
 
     def _prepare_batches(self, logs: List[Dict]) -> Generator[LogBatch, None, None]:
-        """生成符合要求的日志批次（生成器版本）"""
-        current_batch = []
-        current_size = 0
+        """生成符合要求的日志批次（整批快路径，超限时二分回退）"""
         max_size = self.config['log_ingestion']['max_request_size']
         max_events = self.config['log_ingestion']['max_events_per_request']
+        yield from self._split_batches(logs, max_size, max_events)
 
-        for log in logs:
-            serialized = json.dumps(log)
-            entry_size = len(serialized.encode('utf-8'))
-            
-            # 跳过超限条目
-            if entry_size > max_size:
-                self.logger.warning(
-                    "Oversized log entry skipped",
-                    extra={"size": entry_size, "limit": max_size}
-                )
-                continue
-
-            # 检查是否需要提交当前批次
-            if (len(current_batch) >= max_events or 
-                (current_size + entry_size) > max_size):
-                yield self._create_batch(current_batch)
-                current_batch.clear()
-                current_size = 0
-
-            current_batch.append(log)
-            current_size += entry_size
-
-        # 提交最后一批
-        if current_batch:
-            yield self._create_batch(current_batch)
-
-    def _create_batch(self, logs: List[Dict]) -> LogBatch:
-        """创建标准化批次对象"""
-        return LogBatch(
-            serialized_batch=json.dumps(logs),
-            number_of_logs=len(logs)
-        )
+    def _split_batches(self, logs: List[Dict], max_size: int,
+                       max_events: int) -> Generator[LogBatch, None, None]:
+        """先整批序列化一次；放不下则递归对半拆分，单条仍超限即丢弃"""
+        if not logs:
+            return
+
+        blob = _json_dumps_bytes(logs)
+        if len(blob) <= max_size and len(logs) <= max_events:
+            yield LogBatch(serialized_batch=blob, number_of_logs=len(logs))
+            return
+
+        # 跳过超限条目
+        if len(logs) == 1:
+            self.logger.warning(
+                "Oversized log entry skipped",
+                extra={"size": len(blob), "limit": max_size}
+            )
+            return
+
+        mid = len(logs) // 2
+        yield from self._split_batches(logs[:mid], max_size, max_events)
+        yield from self._split_batches(logs[mid:], max_size, max_events)
 
     async def _process_batch(self, 
                            session: aiohttp.ClientSession,
@@ -110,29 +136,45 @@ class LogSender:
                            semaphore: asyncio.Semaphore) -> bool:
         """处理单个日志批次（含信号量控制）"""
         async with semaphore:
-            for attempt in range(1, self.config['performance']['http']['max_retries'] + 1):
+            max_retries = self.config['performance']['http']['max_retries']
+            for attempt in range(1, max_retries + 1):
                 try:
                     return await self._send_batch(session, batch)
-                except Exception as e:
-                    if attempt == self.config['performance']['http']['max_retries']:
-                        self.logger.error(
-                            "Final retry failed for batch",
-                            extra={
-                                "batch_size": batch.number_of_logs,
-                                "attempts": attempt
-                            },
-                            exc_info=True
-                        )
+                except RetryAfterError as e:
+                    if attempt == max_retries:
+                        self._log_final_retry_failure(batch, attempt)
+                        return False
+                    # 服务端限流：按Retry-After指定的秒数等待
+                    await asyncio.sleep(e.seconds)
+                except Exception:
+                    if attempt == max_retries:
+                        self._log_final_retry_failure(batch, attempt)
                         return False
-                    await asyncio.sleep(attempt * 1.5)  # 指数退避
+                    # 指数退避+随机抖动，避免各批次同步重试
+                    await asyncio.sleep(
+                        min(30, 1.5 * (2 ** (attempt - 1))) * (0.5 + random.random())
+                    )
 
             return False  # 理论上不会执行到这里
 
+    def _log_final_retry_failure(self, batch: LogBatch, attempts: int) -> None:
+        """记录批次重试耗尽"""
+        self.logger.error(
+            "Final retry failed for batch",
+            extra={
+                "batch_size": batch.number_of_logs,
+                "attempts": attempts
+            },
+            exc_info=True
+        )
+
     async def _send_batch(self, 
                         session: aiohttp.ClientSession,
                         batch: LogBatch) -> bool:
         """执行单批次发送操作"""
-        compressed = self._compress_data(batch.serialized_batch)
+        compressed = await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._compress_data, batch.serialized_batch
+        )
         
         headers = {
             "Authorization": self._auth_header,
@@ -161,27 +203,30 @@ class LogSender:
             )
             return False
 
-    def _compress_data(self, payload: str) -> bytes:
-        """GZIP压缩处理"""
-        compressed = gzip.compress(
-            payload.encode('utf-8'),
-            compresslevel=self.config['performance']['compression']['gzip_level']
-        )
-        
-        # 记录压缩效率
-        original_size = len(payload.encode('utf-8'))
-        compressed_size = len(compressed)
-        ratio = compressed_size / original_size if original_size > 0 else 0
-        
-        self.logger.debug(
-            "Payload compression stats",
-            extra={
-                "original_size": original_size,
-                "compressed_size": compressed_size,
-                "compression_ratio": f"{ratio:.1%}"
-            }
+    def _compress_data(self, payload: bytes) -> bytes:
+        """GZIP压缩处理（zlib流式接口，免去gzip模块的额外封装开销）"""
+        compressor = zlib.compressobj(
+            self.config['performance']['compression']['gzip_level'],
+            zlib.DEFLATED,
+            31  # wbits=31：输出带gzip头尾的流
         )
-        
+        compressed = compressor.compress(payload) + compressor.flush()
+
+        # 记录压缩效率（仅DEBUG级别才计算比率与格式化）
+        if self.logger.isEnabledFor(logging.DEBUG):
+            original_size = len(payload)
+            compressed_size = len(compressed)
+            ratio = compressed_size / original_size if original_size > 0 else 0
+
+            self.logger.debug(
+                "Payload compression stats",
+                extra={
+                    "original_size": original_size,
+                    "compressed_size": compressed_size,
+                    "compression_ratio": f"{ratio:.1%}"
+                }
+            )
+
         return compressed
 
     async def _handle_response(self, 
@@ -189,15 +234,32 @@ class LogSender:
                              batch: LogBatch) -> bool:
         """处理HTTP响应"""
         if response.status < 300:
-            self.logger.info(
-                "Batch successfully sent",
-                extra={
-                    "batch_size": batch.number_of_logs,
-                    "status": response.status
-                }
-            )
+            # 成功是常态路径，仅INFO级别才构造extra字典
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(
+                    "Batch successfully sent",
+                    extra={
+                        "batch_size": batch.number_of_logs,
+                        "status": response.status
+                    }
+                )
             return True
             
+        # 限流/暂不可用：遵循服务端Retry-After指示重试
+        if response.status in (429, 503):
+            retry_after = response.headers.get("Retry-After")
+            if retry_after is not None:
+                try:
+                    seconds = float(retry_after)
+                except ValueError:
+                    seconds = None
+                if seconds is not None:
+                    raise RetryAfterError(
+                        "Server requested retry delay",
+                        seconds=seconds,
+                        context={"status": response.status}
+                    )
+
         response_text = await response.text()
         self.logger.error(
             "Failed to send batch",
@@ -1,10 +1,9 @@
 # ==== file: system/controller.py ====
-import sys
+import asyncio
 from typing import List
-from signal import signal, SIGINT
+from signal import SIGINT
 from system.monitor import SystemMonitor, ConsoleReporter
 from managers.process_manager import EventHubManager
-import time
 
 
 
@@ -13,29 +12,30 @@ class ApplicationController:
         self.managers = managers
         self.monitor = SystemMonitor(managers)
         self.reporter = ConsoleReporter(self.monitor)
-        self._setup_signal_handlers()
-        
-    def _setup_signal_handlers(self):
-        """注册信号处理"""
-        signal(SIGINT, self._handle_shutdown_signal)
-        
-    def _handle_shutdown_signal(self, signum, frame):
+        self._stop = asyncio.Event()
+
+    def _request_stop(self):
         """处理关闭信号"""
         print("\nReceived shutdown signal...")
-        self.shutdown()
-        sys.exit(0)
-        
-    def run(self):
-        """启动主循环"""
+        self._stop.set()
+
+    async def run(self):
+        """启动主循环（异步，报告器与其他协程共享事件循环）"""
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(SIGINT, self._request_stop)
         try:
-            while True:
-                self.reporter.print_report()
-                time.sleep(60)
-        except KeyboardInterrupt:
+            while not self._stop.is_set():
+                await self.reporter.print_report()
+                try:
+                    # 等待关闭事件，超时即进入下一轮报告
+                    await asyncio.wait_for(self._stop.wait(), timeout=60)
+                except asyncio.TimeoutError:
+                    continue
+        finally:
             self.shutdown()
-            
+
     def shutdown(self):
         """执行优雅关闭"""
         print("Initiating graceful shutdown...")
         for manager in self.managers:
-            manager.shutdown()
\ No newline at end of file
+            manager.shutdown()
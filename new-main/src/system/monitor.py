@@ -1,42 +1,51 @@
 # ==== file: system/monitor.py ====
+import asyncio
 import time
 from typing import Dict, List
 from datetime import datetime
-from managers.process_manager import EventHubManager 
+from managers.process_manager import EventHubManager
 class SystemMonitor:
     def __init__(self, managers: List[EventHubManager]):
         self.managers = managers
         self.start_time = datetime.now()
-        
-    def generate_report(self) -> Dict:
-        """生成系统状态报告"""
+        # 复用的状态容器：名称只格式化一次，每轮报告原地更新
+        self._hub_cache: List[Dict] = [
+            {
+                "name": manager.config['name'],
+                "partitions": {"total": 0, "active": 0, "inactive": []}
+            }
+            for manager in managers
+        ]
+
+    async def generate_report(self) -> Dict:
+        """生成系统状态报告（各管理器并发采集）"""
+        await asyncio.gather(*[
+            self._hub_status(manager, cache)
+            for manager, cache in zip(self.managers, self._hub_cache)
+        ])
         return {
             "uptime": str(datetime.now() - self.start_time),
-            "hubs": [self._hub_status(m) for m in self.managers]
+            "hubs": self._hub_cache
         }
-        
-    def _hub_status(self, manager) -> Dict:
-        """单个事件中心状态"""
+
+    async def _hub_status(self, manager, cache: Dict) -> None:
+        """单个事件中心状态（原地更新缓存条目）"""
         status = manager.monitor()
-        return {
-            "name": status['hub_name'],
-            "partitions": {
-                "total": status['total'],
-                "active": status['active'],
-                "inactive": status['inactive']
-            }
-        }
+        partitions = cache["partitions"]
+        partitions["total"] = status['total']
+        partitions["active"] = status['active']
+        partitions["inactive"] = status['inactive']
 
 class ConsoleReporter:
     def __init__(self, monitor: SystemMonitor):
         self.monitor = monitor
-        
-    def print_report(self):
+
+    async def print_report(self):
         """控制台格式化输出"""
-        report = self.monitor.generate_report()
+        report = await self.monitor.generate_report()
         print(f"\n=== System Status (Uptime: {report['uptime']}) ===")
         for hub in report['hubs']:
             print(f"{hub['name']}:")
             print(f"  Partitions: {hub['partitions']['active']}/{hub['partitions']['total']} active")
             if hub['partitions']['inactive']:
-                print(f"  Inactive: {len(hub['partitions']['inactive'])} partitions")
\ No newline at end of file
+                print(f"  Inactive: {len(hub['partitions']['inactive'])} partitions")